@@ -2,8 +2,12 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import time
-from openpyxl import load_workbook
-from openpyxl.drawing.image import Image
+from data_schema import load_csv, BEUDO_SCHEMA
+from summary_plots import plot_summary_chart
+from bootstrap_ci import add_quantile_cis
+from type_summary import TypeSummary
+from export_stage import ExportStage
+from run_manifest import RunManifest
 sns.set_theme(style="whitegrid", palette="pastel")
 
 # --------------------------------------------------------------------------------------------------------
@@ -91,87 +95,24 @@ def calc_building_type_allocation(df):
 
 
 def filter_and_sort_significant_building_types(df):
-    # Calculate total buildings and total GFA
-    total_buildings = df['total_count'].sum()
-    total_gfa = df['total_gfa'].sum()
-    total_ghg = df['total_ghg'].sum()
+    # Keep building types above the count / GFA / GHG share cutoffs, sorted by count, then GFA, then GHG;
+    # percentages stay relative to all building types
+    summary = TypeSummary.from_frame(df, 'Primary Property Type - Self Selected')
+    significant = summary.significant(0.03, 0.03, 0.05, combine='and').sorted()
 
-    # Filter for building types that represent at least 2% of total buildings and GFA
-    filtered_df = df[
-        (df['total_count'] / total_buildings >= 0.03) &
-        (df['total_gfa'] / total_gfa >= 0.03) &
-        (df['total_ghg'] / total_ghg >= 0.05)
-    ]
-
-    # Sort by total count and then by total GFA (descending order)
-    sorted_df = filtered_df.sort_values(by=['total_count', 'total_gfa', 'total_ghg'], ascending=False)
-
-    # Add percentage columns to the DataFrame
-    sorted_df['percent_of_total_buildings'] = (sorted_df['total_count'] / total_buildings) * 100
-    sorted_df['percent_of_total_gfa'] = (sorted_df['total_gfa'] / total_gfa) * 100
-    sorted_df['percent_of_total_ghg'] = (sorted_df['total_ghg'] / total_ghg) * 100
-
-    return sorted_df
+    return significant.to_frame('Primary Property Type - Self Selected', reference_ghg=GHG_REFERENCE_TOTALS)
 
 
 def calc_ghg_percentages(df):
-    df['percent_of_city_wide_ghg'] = (df['total_ghg'] / TOTAL_CITY_WIDE_EMISSIONS)
-    df['percent_of_building_sector_ghg'] = (df['total_ghg'] / TOTAL_BUILDING_SECTOR_EMISSIONS)
+    # Share of city-wide and building sector GHG per building type, returned as a new frame
+    summary = TypeSummary.from_frame(df, 'Primary Property Type - Self Selected')
 
-    return df
+    return df.assign(**{column: summary.share_of(reference_total)
+                        for column, reference_total in GHG_REFERENCE_TOTALS.items()})
 
 
 def plot_filtered_building_summary(df, filename):
-    fig, axes = plt.subplots(1, 3, figsize=(18, 8))  # figsize=(width, height) in inches
-
-    # Plot for Total Count of Buildings per Building Type
-    sns.barplot(x='total_count', y='Primary Property Type - Self Selected', data=df, ax=axes[0], palette='Blues_d')
-    axes[0].set_title('Total Count of Buildings by Type')
-    axes[0].set_xlabel('Total Count')
-    axes[0].set_ylabel('Building Type')
-
-    # Extend x-axis to make room for the percentage labels
-    max_count = df['total_count'].max()
-    axes[0].set_xlim(0, max_count * 1.15)  # Extend the x-axis by 15%
-
-    # Add percentage labels in front of the bars
-    for index, value in enumerate(df['total_count']):
-        percentage = df['percent_of_total_buildings'].iloc[index]
-        axes[0].text(value + (0.02 * max_count), index, f'{percentage:.1f}%', va='center')
-
-    # Plot for Total GFA per Building Type
-    sns.barplot(x='total_gfa', y='Primary Property Type - Self Selected', data=df, ax=axes[1], palette='Reds_d')
-    axes[1].set_title('Total Gross Floor Area (GFA) by Building Type')
-    axes[1].set_xlabel('Total GFA (ft²)')
-    axes[1].set_ylabel('')
-
-    # Extend x-axis to make room for the percentage labels
-    max_gfa = df['total_gfa'].max()
-    axes[1].set_xlim(0, max_gfa * 1.15)  # Extend the x-axis by 15%
-
-    # Add percentage labels in front of the bars
-    for index, value in enumerate(df['total_gfa']):
-        percentage = df['percent_of_total_gfa'].iloc[index]
-        axes[1].text(value + (0.02 * max_gfa), index, f'{percentage:.1f}%', va='center')
-
-    # Plot for GHG Emissions per Building Type
-    sns.barplot(x='total_ghg', y='Primary Property Type - Self Selected', data=df, ax=axes[2], palette='Greens_d')
-    axes[2].set_title('Total GHG Emissions (MT CO2e) by Building Type')
-    axes[2].set_xlabel('Total GHG (MT CO2e)')
-    axes[2].set_ylabel('')
-
-    # Extend x-axis to make room for the percentage labels
-    max_ghg = df['total_ghg'].max()
-    axes[2].set_xlim(0, max_ghg * 1.15)  # Extend the x-axis by 15%
-
-    # Add percentage labels in front of the bars
-    for index, value in enumerate(df['total_ghg']):
-        percentage = df['percent_of_total_ghg'].iloc[index]
-        axes[2].text(value + (0.02 * max_ghg), index, f'{percentage:.1f}%', va='center')
-
-    plt.tight_layout()
-    plt.savefig(filename)
-    plt.close()
+    plot_summary_chart(df, 'Primary Property Type - Self Selected', filename, figsize=(18, 8))
 
 
 # --------------------------------------------------------------------------------------------------------
@@ -180,14 +121,21 @@ def plot_filtered_building_summary(df, filename):
 
 TOTAL_CITY_WIDE_EMISSIONS = 1413026
 TOTAL_BUILDING_SECTOR_EMISSIONS = 1167913
+GHG_REFERENCE_TOTALS = {
+    'percent_of_city_wide_ghg': TOTAL_CITY_WIDE_EMISSIONS,
+    'percent_of_building_sector_ghg': TOTAL_BUILDING_SECTOR_EMISSIONS,
+}
 
 # --------------------------------------------------------------------------------------------------------
 # ----------------------------------- Clean Data & Generate CSVs -----------------------------------------
 # --------------------------------------------------------------------------------------------------------
 
+# End-to-end wall time is measured from here, before the load
+run_start = time.perf_counter()
+
 # File path to BEUDO data & read in CSV
 file_path = '../data-files/beudo_data_files/BEUDO_Data.csv'
-df = pd.read_csv(file_path)
+df = load_csv(file_path, BEUDO_SCHEMA)
 
 df = df[(df['Data Year'] == 2021) & (~df['Property GFA - Self Reported (ft2)'].isnull())]
 df = df.sort_values(by='Data Year', ascending=True)
@@ -206,47 +154,49 @@ df = df.sort_values(by=['Reporting ID'], ascending=True)
 # Generate portfolio summary statistics
 building_type_summary_df = calc_building_type_allocation(df)
 building_type_summary_df = calc_ghg_percentages(building_type_summary_df)
-building_type_summary_df.to_csv('../data-files/beudo_data_files/beudo-building_summary.csv', index=False)
 
 # Gross Floor Area (GFA) summary
 gfa_bins = [0, 50000, 100000, 250000, 500000, 1000000, float('inf')]
 gfa_labels = ['<50k sf', '50k-100k sf', '150k-250k sf', '250k-500k sf', '500k-1M sf', '>1M sf']
 gfa_df = calc_building_type_summary_stats(df, 'Property GFA - Self Reported (ft2)', gfa_bins, gfa_labels)
-gfa_df.to_csv('../data-files/beudo_data_files/beudo-gfa_summary.csv', index=False)
+gfa_df = add_quantile_cis(gfa_df, df, 'Primary Property Type - Self Selected', 'Property GFA - Self Reported (ft2)')
 
 # Site EUI summary
 eui_bins = [0, 20, 40, 60, 80, 100, 150, 250, 500, float('inf')]
 eui_labels = ['<20 kbtu/sf', '<40 kbtu/sf', '<60 kbtu/sf', '<80 kbtu/sf', '<100 kbtu/sf', '<150 kbtu/sf',
               '<250 kbtu/sf', '<500 kbtu/sf', '>500 kbtu/sf']
 eui_df = calc_building_type_summary_stats(df, 'Site EUI (kBtu/ft2)', eui_bins, eui_labels)
-eui_df.to_csv('../data-files/beudo_data_files/beudo-eui_summary.csv', index=False)
+eui_df = add_quantile_cis(eui_df, df, 'Primary Property Type - Self Selected', 'Site EUI (kBtu/ft2)')
+
+# Every bootstrap CI is computed before the export stage starts its writer threads, so the bootstrap process
+# pool never forks a multi-threaded process. From here on, output artifacts are written in the background as
+# soon as they are ready; the run manifest records a content hash of each one so refreshes can be diffed
+# with 'python run_manifest.py diff'
+export = ExportStage(manifest=RunManifest('../data-files/beudo_data_files/beudo-run_manifest.json'),
+                     run_start=run_start)
+export.csv(building_type_summary_df, '../data-files/beudo_data_files/beudo-building_summary.csv')
+export.csv(gfa_df, '../data-files/beudo_data_files/beudo-gfa_summary.csv')
+export.csv(eui_df, '../data-files/beudo_data_files/beudo-eui_summary.csv')
 
 # --------------------------------------------------------------------------------------------------------
 # ----------------------------------- Excel Summary Stats ------------------------------------------------
 # --------------------------------------------------------------------------------------------------------
 
-with pd.ExcelWriter('../data-files/beudo_data_files/beudo_building_summary_statistics.xlsx',
-                    engine='openpyxl') as writer:
-    building_type_summary_df.to_excel(writer, sheet_name='Building Type Summary', index=False)
-    gfa_df.to_excel(writer, sheet_name='GFA Summary', index=False)
-    eui_df.to_excel(writer, sheet_name='EUI Summary', index=False)
-
 filtered_sorted_summary_df = filter_and_sort_significant_building_types(building_type_summary_df)
 
-# Generate the plot and save it as an image
+# Render the plot while the workbook sheets are serialized; it is inserted as the first sheet once ready
 plot_filename = '../data-files/beudo_data_files/beudo_building_summary_statistics.png'
-plot_filtered_building_summary(filtered_sorted_summary_df, plot_filename)
-
-# Load the workbook and access the active sheet (which will be the first sheet by default)
-workbook = load_workbook('../data-files/beudo_data_files/beudo_building_summary_statistics.xlsx')
-worksheet = workbook.create_sheet('Summary with Graphs', 0)  # Create a new sheet at the first position
+plot_future = export.plot(plot_filtered_building_summary, filtered_sorted_summary_df, plot_filename)
 
-# Insert the image into the sheet
-img = Image(plot_filename)
-worksheet.add_image(img, 'B2')
+export.excel({
+    'Building Type Summary': building_type_summary_df,
+    'GFA Summary': gfa_df,
+    'EUI Summary': eui_df,
+}, '../data-files/beudo_data_files/beudo_building_summary_statistics.xlsx', image=plot_future)
 
-# Save the workbook with the image inserted
-workbook.save('../data-files/beudo_data_files/beudo_building_summary_statistics.xlsx')
+# Wait for every write to land and report end-to-end wall time, and the part spent in the export stage
+elapsed, export_elapsed = export.wait()
+print(f'BEUDO summaries written in {elapsed:.2f} s ({export_elapsed:.2f} s exporting)')
 
 # --------------------------------------------------------------------------------------------------------
 # ----------------------------------- Create Histogram Images --------------------------------------------
@@ -0,0 +1,132 @@
+import multiprocessing
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Quantiles reported in the gfa/eui summaries
+QUANTILES = {'q1': 0.25, 'q2': 0.50, 'q3': 0.75}
+
+# Datasets smaller than this are resampled in-process; pool start-up costs more than it saves
+PARALLEL_MIN_ROWS = 20000
+
+# Upper bound on resample-matrix elements held in memory at once per group
+MAX_BLOCK_ELEMENTS = 4_000_000
+
+
+def group_seed(seed, group_name):
+    # Each property type gets its own RNG stream keyed by name, so results do not depend on group order,
+    # on which other types are present, or on how groups are spread across workers
+    return np.random.SeedSequence([seed, zlib.crc32(str(group_name).encode())])
+
+
+def block_sizes(n, n_resamples):
+    # Resamples per block, each block holding at most MAX_BLOCK_ELEMENTS indices. Blocks depend only on the
+    # group size, so results are the same whatever the worker count
+    block = max(1, MAX_BLOCK_ELEMENTS // n)
+    return [min(block, n_resamples - start) for start in range(0, n_resamples, block)]
+
+
+def resample_quantiles(values, quantiles, n_resamples, seed_sequence):
+    # Resample index matrix (resamples x n), quantiles taken along the resample rows -> (quantiles x resamples)
+    rng = np.random.default_rng(seed_sequence)
+    indices = rng.integers(0, len(values), size=(n_resamples, len(values)))
+    return np.quantile(values[indices], quantiles, axis=1)
+
+
+def percentile_interval(estimates, confidence):
+    # Percentile interval over the bootstrap distribution of each quantile
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(estimates, [alpha, 1 - alpha], axis=1)
+
+    return low, high
+
+
+def group_tasks(values, quantiles, n_resamples, seed_sequence):
+    # One task per block, each with its own child stream of the group's seed
+    sizes = block_sizes(len(values), n_resamples)
+    return [(values, quantiles, size, block_seed) for size, block_seed in zip(sizes, seed_sequence.spawn(len(sizes)))]
+
+
+def bootstrap_group(values, quantiles, n_resamples, confidence, seed_sequence):
+    if len(values) < 2:
+        return np.full(len(quantiles), np.nan), np.full(len(quantiles), np.nan)
+
+    estimates = [resample_quantiles(*task) for task in group_tasks(values, quantiles, n_resamples, seed_sequence)]
+
+    return percentile_interval(np.concatenate(estimates, axis=1), confidence)
+
+
+def _resample_quantiles_task(args):
+    return resample_quantiles(*args)
+
+
+def bootstrap_quantile_cis(df, type_column, column, n_resamples=2000, confidence=0.95, seed=2024, n_workers=None):
+    # Non-missing values per property type
+    values = pd.to_numeric(df[column], errors='coerce')
+    groups = {name: group.dropna().to_numpy(dtype='float64')
+              for name, group in values.groupby(df[type_column], observed=True)}
+    names = sorted(groups, key=lambda name: len(groups[name]), reverse=True)
+
+    # Large groups are split into resample blocks so one dominant property type does not serialize the pool;
+    # biggest blocks go first so workers stay evenly loaded
+    quantiles = list(QUANTILES.values())
+    tasks = [(name, task) for name in names if len(groups[name]) >= 2
+             for task in group_tasks(groups[name], quantiles, n_resamples, group_seed(seed, name))]
+    tasks.sort(key=lambda item: len(item[1][0]) * item[1][2], reverse=True)
+
+    use_pool = (n_workers is None and len(df) >= PARALLEL_MIN_ROWS) or (n_workers is not None and n_workers > 1)
+    if use_pool and sys.platform.startswith('linux'):
+        # Fork so workers never re-import the calling analysis script. Fork is only used on Linux (CPython
+        # documents it as unsafe on macOS), and callers must run this before starting any threads (e.g. an
+        # ExportStage): forking a multi-threaded process can deadlock the children
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            results = list(pool.map(_resample_quantiles_task, [task for _, task in tasks]))
+    else:
+        results = [_resample_quantiles_task(task) for _, task in tasks]
+
+    estimates = {name: [] for name in names}
+    for (name, _), block_estimates in zip(tasks, results):
+        estimates[name].append(block_estimates)
+
+    nan_interval = (np.full(len(quantiles), np.nan), np.full(len(quantiles), np.nan))
+    intervals = [percentile_interval(np.concatenate(estimates[name], axis=1), confidence) if estimates[name]
+                 else nan_interval for name in names]
+
+    ci_df = pd.DataFrame({type_column: names})
+    for position, label in enumerate(QUANTILES):
+        ci_df[f'{label}_ci_low'] = [low[position] for low, _ in intervals]
+        ci_df[f'{label}_ci_high'] = [high[position] for _, high in intervals]
+
+    return ci_df
+
+
+def add_quantile_cis(summary_df, df, type_column, column, **kwargs):
+    # Merge CI columns into a calc_building_type_summary_stats result, right after the q3 column
+    ci_df = bootstrap_quantile_cis(df, type_column, column, **kwargs)
+    ci_columns = [c for c in ci_df.columns if c != type_column]
+
+    result_df = summary_df.merge(ci_df, on=type_column, how='left')
+    insert_at = list(summary_df.columns).index('q3') + 1
+    ordered_columns = list(summary_df.columns[:insert_at]) + ci_columns + list(summary_df.columns[insert_at:])
+
+    return result_df[ordered_columns]
+
+
+if __name__ == '__main__':
+    # Serial vs. pooled timing on an LL84-sized synthetic dataset
+    rng = np.random.default_rng(31)
+    n_buildings = 30000
+    bench_df = pd.DataFrame({
+        'Property Type': rng.choice([f'Type {i}' for i in range(70)], n_buildings, p=np.r_[0.6, np.full(69, 0.4 / 69)]),
+        'Site EUI (kBtu/sf)': rng.lognormal(4.3, 0.4, n_buildings),
+    })
+
+    for n_workers in (1, None):
+        start = time.perf_counter()
+        bench_ci_df = bootstrap_quantile_cis(bench_df, 'Property Type', 'Site EUI (kBtu/sf)', n_workers=n_workers)
+        print(f'{"serial" if n_workers == 1 else "pooled"}: {time.perf_counter() - start:.2f} s '
+              f'for {len(bench_ci_df)} types x 2000 resamples')
@@ -0,0 +1,52 @@
+import os
+import pandas as pd
+from data_schema import load_csv, BERDO_SCHEMA, BEUDO_SCHEMA, LL84_SCHEMA
+from property_taxonomy import (BERDO_LOOKUP, LL84_EXEMPT_PROPERTY_TYPES, PORTFOLIO_MANAGER_LOOKUP,
+                               calc_combined_allocation, to_harmonized_frame, unmapped_property_types)
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Load & Harmonize Each Jurisdiction ---------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+harmonized_frames = []
+
+# Boston (BERDO): already grouped into BERDO property types
+berdo_df = load_csv('../data-files/berdo_data_files/BERDO_Data.csv', BERDO_SCHEMA)
+harmonized_frames.append(to_harmonized_frame(berdo_df, 'Boston', 'BERDO Property Type', BERDO_LOOKUP,
+                                             'Reported Gross Floor Area (Sq Ft)', 'Total GHG Emissions (MT CO2e)'))
+
+# Cambridge (BEUDO): same 2021 filter as beudo-data.py, grouped from the self-selected Portfolio Manager type
+beudo_df = load_csv('../data-files/beudo_data_files/BEUDO_Data.csv', BEUDO_SCHEMA)
+beudo_df = beudo_df[(beudo_df['Data Year'] == 2021) & (~beudo_df['Property GFA - Self Reported (ft2)'].isnull())]
+harmonized_frames.append(to_harmonized_frame(beudo_df, 'Cambridge', 'Primary Property Type - Self Selected',
+                                             PORTFOLIO_MANAGER_LOOKUP, 'Property GFA - Self Reported (ft2)',
+                                             'Total GHG Emissions (Metric Tons CO2e)'))
+
+# New York City (LL84): same exemptions as ll84-data.py; the raw release is large and not always checked out
+ll84_file_path = '../data-files/LL_84_data_files/LL84_Data.csv'
+if os.path.exists(ll84_file_path):
+    ll84_df = load_csv(ll84_file_path, LL84_SCHEMA)
+    ll84_df = ll84_df[~ll84_df['Primary Property Type - Self Selected'].isin(LL84_EXEMPT_PROPERTY_TYPES)]
+    harmonized_frames.append(to_harmonized_frame(ll84_df, 'New York City', 'Primary Property Type - Self Selected',
+                                                 PORTFOLIO_MANAGER_LOOKUP, 'Gross Floor Area (ft2)',
+                                                 'Total GHG Emissions (Metric Tons CO2e)'))
+else:
+    print(f'{ll84_file_path} not found; combined summary covers Boston and Cambridge only')
+
+# Single columnar frame for every jurisdiction
+combined_df = pd.concat(harmonized_frames, ignore_index=True)
+combined_df['jurisdiction'] = combined_df['jurisdiction'].astype('category')
+
+# Flag raw property types that fell through to 'Other' so the lookup can be extended
+unmapped = unmapped_property_types(combined_df['property_type'], {**BERDO_LOOKUP, **PORTFOLIO_MANAGER_LOOKUP})
+if unmapped:
+    print(f'Property types without a canonical mapping (counted as Other): {unmapped}')
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Combined Allocation Summary ----------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+os.makedirs('../data-files/combined_data_files', exist_ok=True)
+
+combined_summary_df = calc_combined_allocation(combined_df)
+combined_summary_df.to_csv('../data-files/combined_data_files/combined-building_summary.csv', index=False)
@@ -0,0 +1,195 @@
+import csv
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from energy_engine import BERDO_EMISSIONS_COLUMNS, BERDO_FUEL_COLUMNS, LL84_FUEL_COLUMNS
+
+# Parse dtype for each kind of column. Text stays object (no extra string-dtype conversion pass) and integers
+# parse as float64, then become nullable Int64, which is cheaper than the nullable integer parser
+DTYPES = {'text': object, 'number': 'float64', 'integer': 'float64'}
+
+# Strings that city releases use for missing values in otherwise numeric columns
+NA_VALUES = ['Not Available', 'N/A', 'NA', '']
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def column(kind, *aliases, required=True):
+    return {'kind': kind, 'aliases': list(aliases), 'required': required}
+
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Dataset Schemas ----------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+# Canonical names are the names the analysis scripts use; aliases are what other data vintages call them
+BERDO_SCHEMA = {
+    'BERDO ID': column('integer'),
+    'Property Owner Name': column('text', 'Owner', 'Property Owner'),
+    'Building Address': column('text', 'Address', 'Property Address'),
+    'Reported Gross Floor Area (Sq Ft)': column('number', 'Reported Gross Floor Area (ft2)',
+                                                'Gross Floor Area (Sq Ft)', 'Gross Floor Area (ft2)'),
+    'Largest Property Type': column('text'),
+    'Site EUI (Energy Use Intensity kBtu/ft2)': column('number', 'Site EUI (kBtu/ft2)', 'Site EUI (kBtu/sf)'),
+    'Total GHG Emissions (MT CO2e)': column('number', 'Total GHG Emissions (Metric Tons CO2e)'),
+    'BERDO Property Type': column('text'),
+    **{fuel_column: column('number', required=False) for fuel_column in BERDO_FUEL_COLUMNS.values()},
+    **{emissions_column: column('number', required=False) for emissions_column in BERDO_EMISSIONS_COLUMNS.values()},
+}
+
+BEUDO_SCHEMA = {
+    'Reporting ID': column('text'),
+    'Data Year': column('integer', 'Calendar Year'),
+    'BEUDO Category': column('text'),
+    'Primary Property Type - Self Selected': column('text', 'Primary Property Type'),
+    'Property GFA - Self Reported (ft2)': column('number', 'Property GFA - Self-Reported (ft2)',
+                                                 'Gross Floor Area (ft2)'),
+    'Owner': column('text'),
+    'Site EUI (kBtu/ft2)': column('number', 'Site EUI (kBtu/sf)', 'Site EUI (Energy Use Intensity kBtu/ft2)'),
+    'Total GHG Emissions (Metric Tons CO2e)': column('number', 'Total GHG Emissions (MT CO2e)'),
+    'Total GHG Emissions Intensity (kgCO2e/ft2)': column('number', 'Total GHG Emissions Intensity (kgCO2e/sf)'),
+}
+
+LL84_SCHEMA = {
+    'Property Id': column('integer'),
+    'Property Name': column('text'),
+    'Address 1': column('text', 'Address 1 (self-reported)'),
+    'City': column('text'),
+    'Primary Property Type - Portfolio Manager-Calculated': column('text'),
+    'List of All Property Use Types at Property': column('text'),
+    'Primary Property Type - Self Selected': column('text'),
+    'Gross Floor Area (ft2)': column('number', 'Property GFA - Self-Reported (ft2)'),
+    '2nd Largest Property Use - Gross Floor Area (ft2)': column('number'),
+    '3rd Largest Property Use Type - Gross Floor Area (ft2)': column('number'),
+    'Year Built': column('integer'),
+    'Number of Buildings': column('number'),
+    'Site EUI (kBtu/sf)': column('number', 'Site EUI (kBtu/ft2)'),
+    'Total GHG Emissions (Metric Tons CO2e)': column('number', 'Total (Location-Based) GHG Emissions (Metric Tons CO2e)',
+                                                     'Total GHG Emissions (MT CO2e)'),
+    'Direct GHG Emissions Intensity (kgCO2e/ft2)': column('number'),
+    'Indirect GHG Emissions Intensity (kgCO2e/ft2)': column('number'),
+    'Property GFA - Calculated (Buildings) (ft2)': column('number'),
+    'Property GFA - Calculated (Buildings and Parking) (ft2)': column('number'),
+    'Latitude': column('number'),
+    'Longitude': column('number'),
+    **{fuel_column: column('number', required=False) for fuel_column in LL84_FUEL_COLUMNS.values()},
+}
+
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Header Resolution & Validation -------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+def normalize_column_name(name):
+    # Case, whitespace and the superscript in 'ft²' vary between releases
+    return re.sub(r'\s+', ' ', str(name).replace('²', '2')).strip().lower()
+
+
+def resolve_columns(header, schema, file_path=''):
+    # Map each header column that matches a canonical name (or one of its aliases) to that canonical name
+    normalized_header = {}
+    for name in header:
+        normalized_header.setdefault(normalize_column_name(name), name)
+
+    rename = {}
+    missing = []
+    for canonical, spec in schema.items():
+        candidates = [canonical] + spec['aliases']
+        matches = [normalized_header[normalize_column_name(c)] for c in candidates
+                   if normalize_column_name(c) in normalized_header]
+        if matches:
+            rename[matches[0]] = canonical
+        elif spec['required']:
+            missing.append(f"'{canonical}' (tried: {candidates})")
+
+    if missing:
+        raise SchemaError(f'{file_path}: missing required columns:\n  ' + '\n  '.join(missing))
+
+    return rename
+
+
+def check_values(raw_df, rename, schema, file_path=''):
+    # Find which numeric columns hold values that do not parse, in one to_numeric pass over the whole block
+    numeric_columns = [source_name for source_name, canonical in rename.items() if schema[canonical]['kind'] != 'text']
+    values = raw_df[numeric_columns]
+    parsed = pd.to_numeric(pd.Series(values.to_numpy(dtype=object).ravel()), errors='coerce')
+    parsed = parsed.to_numpy(dtype='float64').reshape(values.shape)
+
+    bad = values.notna().to_numpy() & np.isnan(parsed)
+    is_integer = np.array([schema[rename[source_name]]['kind'] == 'integer' for source_name in numeric_columns])
+    bad |= is_integer & ~np.isnan(parsed) & (parsed % 1 != 0)
+
+    problems = []
+    for position in np.flatnonzero(bad.any(axis=0)):
+        source_name = numeric_columns[position]
+        examples = values[source_name][bad[:, position]].astype(str).unique()[:3].tolist()
+        problems.append(f"'{source_name}' expected {schema[rename[source_name]]['kind']}, found e.g. {examples}")
+
+    if problems:
+        raise SchemaError(f'{file_path}: column type check failed:\n  ' + '\n  '.join(problems))
+
+
+def read_header(file_path):
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f))
+
+
+def read_typed(file_path, rename, schema):
+    # Only the needed columns, each parsed straight to its final dtype
+    dtype = {source_name: DTYPES[schema[canonical]['kind']] for source_name, canonical in rename.items()}
+    df = pd.read_csv(file_path, usecols=list(rename), dtype=dtype, na_values=NA_VALUES, keep_default_na=True)
+
+    for source_name, canonical in rename.items():
+        if schema[canonical]['kind'] == 'integer':
+            df[source_name] = df[source_name].astype('Int64')
+
+    return df
+
+
+def load_csv(file_path, schema):
+    # Header only: resolve aliases and fail before the bulk parse if anything is missing
+    header = read_header(file_path)
+    rename = resolve_columns(header, schema, file_path)
+
+    try:
+        # The typed parse is itself the type check, over every row and at no extra cost
+        df = read_typed(file_path, rename, schema)
+    except (ValueError, TypeError):
+        # Slow path, only on failure: re-read as raw text to report which columns and values do not parse
+        raw_df = pd.read_csv(file_path, usecols=list(rename), dtype=str, na_values=NA_VALUES, keep_default_na=True)
+        check_values(raw_df, rename, schema, file_path)
+        raise
+
+    return df.rename(columns=rename)
+
+
+if __name__ == '__main__':
+    # Compare the schema-driven load against a plain full parse (median of interleaved runs)
+    for file_path, schema in [('../data-files/berdo_data_files/BERDO_Data.csv', BERDO_SCHEMA),
+                              ('../data-files/beudo_data_files/BEUDO_Data.csv', BEUDO_SCHEMA)]:
+        full_times, schema_times = [], []
+        for _ in range(20):
+            start = time.perf_counter()
+            pd.read_csv(file_path)
+            full_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            loaded_df = load_csv(file_path, schema)
+            schema_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        try:
+            load_csv(file_path, {**schema, 'Renamed Column': column('number')})
+        except SchemaError:
+            pass
+        fail_time = time.perf_counter() - start
+
+        print(f'{file_path}: {len(loaded_df.columns)} columns')
+        print(f'  Full parse:      {np.median(full_times) * 1000:.1f} ms')
+        print(f'  Schema load:     {np.median(schema_times) * 1000:.1f} ms')
+        print(f'  Missing column:  {fail_time * 1000:.1f} ms to fail')
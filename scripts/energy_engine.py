@@ -0,0 +1,190 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Fuel Factor Sets ---------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+FUELS = [
+    'Electricity', 'Natural Gas', 'District Steam', 'District Hot Water', 'District Chilled Water',
+    'Fuel Oil #1', 'Fuel Oil #2', 'Fuel Oil #4', 'Fuel Oil #5 & 6', 'Propane', 'Diesel #2', 'Kerosene'
+]
+
+# ENERGY STAR Portfolio Manager site-to-source ratios (US national), shared by every factor set below
+PORTFOLIO_MANAGER_SITE_TO_SOURCE = {
+    'Electricity': 2.80, 'Natural Gas': 1.05, 'District Steam': 1.20, 'District Hot Water': 1.20,
+    'District Chilled Water': 0.91, 'Fuel Oil #1': 1.01, 'Fuel Oil #2': 1.01, 'Fuel Oil #4': 1.01,
+    'Fuel Oil #5 & 6': 1.01, 'Propane': 1.01, 'Diesel #2': 1.01, 'Kerosene': 1.01,
+}
+
+# Emissions factors are in kgCO2e/MMBtu. 'berdo-2022' is as published in the BERDO 2022 data release.
+# 'nyc-ll97-2024' uses the NYC Local Law 97 2024-2029 coefficients for electricity, natural gas, district steam
+# and fuel oils #2 and #4, and the BERDO values for fuels LL97 does not list. Register a new version instead of
+# editing one in place so cached results never go stale.
+FACTOR_SETS = {
+    'berdo-2022': {
+        'site_to_source': PORTFOLIO_MANAGER_SITE_TO_SOURCE,
+        'emissions': {
+            'Electricity': 83.83, 'Natural Gas': 53.11, 'District Steam': 66.40, 'District Hot Water': 66.40,
+            'District Chilled Water': 66.40, 'Fuel Oil #1': 73.50, 'Fuel Oil #2': 74.21, 'Fuel Oil #4': 75.29,
+            'Fuel Oil #5 & 6': 75.35, 'Propane': 61.71, 'Diesel #2': 74.21, 'Kerosene': 75.20,
+        },
+    },
+    'nyc-ll97-2024': {
+        'site_to_source': PORTFOLIO_MANAGER_SITE_TO_SOURCE,
+        'emissions': {
+            'Electricity': 84.69, 'Natural Gas': 53.11, 'District Steam': 44.93, 'District Hot Water': 66.40,
+            'District Chilled Water': 66.40, 'Fuel Oil #1': 73.50, 'Fuel Oil #2': 74.21, 'Fuel Oil #4': 75.29,
+            'Fuel Oil #5 & 6': 75.35, 'Propane': 61.71, 'Diesel #2': 74.21, 'Kerosene': 75.20,
+        },
+    },
+}
+
+# Raw per-fuel usage columns (kBtu) for each data source
+BERDO_FUEL_COLUMNS = {
+    'Electricity': 'Electricity Usage (kBtu)',
+    'Natural Gas': 'Natural Gas Usage (kBtu)',
+    'District Steam': 'District Steam Usage (kBtu)',
+    'District Hot Water': 'District Hot Water Usage (kBtu)',
+    'District Chilled Water': 'District Chilled Water Usage (kBtu)',
+    'Fuel Oil #1': 'Fuel Oil 1 Usage (kBtu)',
+    'Fuel Oil #2': 'Fuel Oil 2 Usage (kBtu)',
+    'Fuel Oil #4': 'Fuel Oil 4 Usage (kBtu)',
+    'Fuel Oil #5 & 6': 'Fuel Oil 5 and 6 Usage (kBtu)',
+    'Propane': 'Propane Usage (kBtu)',
+    'Diesel #2': 'Diesel Usage (kBtu)',
+    'Kerosene': 'Kerosene Usage (kBtu)',
+}
+
+# Per-fuel emissions (MT CO2e) as reported in the BERDO release
+BERDO_EMISSIONS_COLUMNS = {
+    'Electricity': 'Electricity Emissions (MT CO2e)',
+    'Natural Gas': 'Natural Gas Emissions (MT CO2e)',
+    'District Steam': 'District Steam Emissions (MT CO2e)',
+    'District Chilled Water': 'District Chilled Water Emissions (MT CO2e)',
+    'Fuel Oil #1': 'Fuel Oil #1 Emissions (MT CO2e)',
+    'Fuel Oil #2': 'Fuel Oil #2 Emissions (MT CO2e)',
+    'Fuel Oil #4': 'Fuel Oil #4 Emissions (MT CO2e)',
+    'Fuel Oil #5 & 6': 'Fuel Oil #5 & #6 Emissions (MT CO2e)',
+    'Propane': 'Propane Emissions (MT CO2e)',
+    'Diesel #2': 'Diesel #2 Emissions (MT CO2e)',
+    'Kerosene': 'Kerosene Emissions (MT CO2e)',
+}
+
+# Per-fuel emissions columns produced by FuelEnergyEngine.to_frame, named as in the BERDO release
+EMISSIONS_COLUMNS = {fuel: BERDO_EMISSIONS_COLUMNS.get(fuel, f'{fuel} Emissions (MT CO2e)') for fuel in FUELS}
+
+LL84_FUEL_COLUMNS = {
+    'Electricity': 'Electricity Use - Grid Purchase (kBtu)',
+    'Natural Gas': 'Natural Gas Use (kBtu)',
+    'District Steam': 'District Steam Use (kBtu)',
+    'District Hot Water': 'District Hot Water Use (kBtu)',
+    'District Chilled Water': 'District Chilled Water Use (kBtu)',
+    'Fuel Oil #1': 'Fuel Oil #1 Use (kBtu)',
+    'Fuel Oil #2': 'Fuel Oil #2 Use (kBtu)',
+    'Fuel Oil #4': 'Fuel Oil #4 Use (kBtu)',
+    'Fuel Oil #5 & 6': 'Fuel Oil #5 & 6 Use (kBtu)',
+    'Propane': 'Propane Use (kBtu)',
+    'Diesel #2': 'Diesel #2 Use (kBtu)',
+    'Kerosene': 'Kerosene Use (kBtu)',
+}
+
+
+def register_factor_set(version, site_to_source, emissions):
+    if version in FACTOR_SETS:
+        raise ValueError(f'Factor set {version!r} already exists; register changed factors under a new version')
+
+    missing = [fuel for fuel in FUELS if fuel not in site_to_source or fuel not in emissions]
+    if missing:
+        raise ValueError(f'Factor set {version!r} is missing factors for: {missing}')
+
+    FACTOR_SETS[version] = {'site_to_source': dict(site_to_source), 'emissions': dict(emissions)}
+
+
+@lru_cache(maxsize=None)
+def factor_matrix(version, fuels):
+    # (fuels x 2) matrix: column 0 is the site-to-source ratio, column 1 is MT CO2e per kBtu
+    if version not in FACTOR_SETS:
+        raise KeyError(f'Unknown factor set {version!r}; available: {sorted(FACTOR_SETS)}')
+
+    factor_set = FACTOR_SETS[version]
+    matrix = np.array([[factor_set['site_to_source'][fuel], factor_set['emissions'][fuel] / 1e6] for fuel in fuels])
+    matrix.setflags(write=False)
+
+    return matrix
+
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Source EUI & Emissions Engine --------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+class FuelEnergyEngine:
+    def __init__(self, df, fuel_columns, gfa_column):
+        # Only fuels the data source actually reports become columns of the usage matrix
+        self.fuels = tuple(fuel for fuel in FUELS if fuel in fuel_columns and fuel_columns[fuel] in df.columns)
+        self.index = df.index
+
+        # (buildings x fuels) usage matrix in kBtu; blanks and 'Not Available' count as zero usage for a fuel,
+        # but buildings with no fuel reported at all (or only zeros) get NaN results rather than zeros
+        usage = df[[fuel_columns[fuel] for fuel in self.fuels]].apply(pd.to_numeric, errors='coerce')
+        usage = usage.to_numpy(dtype='float64')
+        self.usage = np.nan_to_num(usage, nan=0.0)
+        self.no_usage = np.isnan(usage).all(axis=1) | (self.usage.sum(axis=1) == 0)
+
+        gfa = pd.to_numeric(df[gfa_column], errors='coerce').to_numpy(dtype='float64')
+        self.gfa = np.where(gfa > 0, gfa, np.nan)
+
+        self._results = {}
+
+    def compute(self, version):
+        # Results are cached per factor-set version, so only the matrix multiply reruns on a factor change
+        if version not in self._results:
+            factors = factor_matrix(version, self.fuels)
+            totals = self.usage @ factors
+            totals[self.no_usage] = np.nan
+            fuel_emissions = self.usage * factors[:, 1]
+            fuel_emissions[self.no_usage] = np.nan
+            self._results[version] = {
+                'source_energy': totals[:, 0],
+                'source_eui': totals[:, 0] / self.gfa,
+                'fuel_emissions': fuel_emissions,
+                'total_emissions': totals[:, 1],
+            }
+
+        return self._results[version]
+
+    def to_frame(self, version):
+        results = self.compute(version)
+
+        result_df = pd.DataFrame(results['fuel_emissions'], index=self.index,
+                                 columns=[EMISSIONS_COLUMNS[fuel] for fuel in self.fuels])
+        result_df.insert(0, 'Source Energy Use (kBtu)', results['source_energy'])
+        result_df.insert(1, 'Source EUI (kBtu/ft2)', results['source_eui'])
+        result_df['Derived Total GHG Emissions (MT CO2e)'] = results['total_emissions']
+
+        return result_df
+
+
+if __name__ == '__main__':
+    # Benchmark the engine against the BERDO release
+    berdo_df = pd.read_csv('../data-files/berdo_data_files/BERDO_Data.csv')
+
+    start = time.perf_counter()
+    engine = FuelEnergyEngine(berdo_df, BERDO_FUEL_COLUMNS, 'Reported Gross Floor Area (Sq Ft)')
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.compute('berdo-2022')
+    compute_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.compute('berdo-2022')
+    cached_time = time.perf_counter() - start
+
+    print(f'{len(berdo_df)} buildings x {len(engine.fuels)} fuels')
+    print(f'Usage matrix build: {build_time * 1000:.2f} ms')
+    print(f'Factor-set compute: {compute_time * 1000:.3f} ms')
+    print(f'Cached lookup:      {cached_time * 1000:.4f} ms')
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.drawing.image import Image
+
+# mkstemp creates owner-only files; outputs get the usual umask-derived mode instead (read once at import)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write(path, write, before_replace=None):
+    # write() fills a temp file next to the target, which is then renamed over it in one step, so a crash
+    # never leaves a half-written output behind; the temp file keeps the extension for format detection.
+    # before_replace() runs only once the temp file is complete, right before the rename
+    directory, filename = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{filename}.', suffix=os.path.splitext(filename)[1])
+    os.close(fd)
+
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        if before_replace is not None:
+            before_replace()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return path
+
+
+class ExportStage:
+    # Writes independent output artifacts on a thread pool as soon as their inputs are ready. With a
+    # run_manifest.RunManifest, every artifact is also hashed on the same worker and the manifest is written
+    # once all outputs have landed
+    def __init__(self, max_workers=4, manifest=None, run_start=None):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = []
+        self.manifest = manifest
+        self.start_time = time.perf_counter()
+        self.run_start = self.start_time if run_start is None else run_start
+
+    def _submit(self, fn, *args):
+        future = self.pool.submit(fn, *args)
+        self.futures.append(future)
+        return future
+
+    def _record(self, method, path, *args):
+        if self.manifest is not None:
+            getattr(self.manifest, method)(path, *args)
+
+    def csv(self, df, path):
+        def write_and_record():
+            atomic_write(path, lambda tmp_path: df.to_csv(tmp_path, index=False))
+            self._record('add_table', path, df)
+            return path
+
+        return self._submit(write_and_record)
+
+    def plot(self, render, df, path):
+        # render(df, filename) must not use pyplot global state (see summary_plots.plot_summary_chart)
+        def write_and_record():
+            atomic_write(path, lambda tmp_path: render(df, tmp_path))
+            self._record('add_file', path)
+            return path
+
+        return self._submit(write_and_record)
+
+    def excel(self, sheets, path, image=None, image_sheet='Summary with Graphs'):
+        # Sheets are serialized right away; an image future (e.g. from plot()) is only waited on at the end,
+        # and the workbook is written exactly once
+        def write(tmp_path):
+            with pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
+                for sheet_name, sheet_df in sheets.items():
+                    sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+            if image is not None:
+                workbook = load_workbook(tmp_path)
+                worksheet = workbook.create_sheet(image_sheet, 0)  # Create a new sheet at the first position
+                worksheet.add_image(Image(image.result()), 'B2')
+                workbook.save(tmp_path)
+
+        def write_and_record():
+            atomic_write(path, write)
+            self._record('add_workbook', path, sheets)
+            return path
+
+        return self._submit(write_and_record)
+
+    def wait(self):
+        # Re-raises the first failed write; returns (end-to-end wall time since run_start, wall time since the
+        # stage was created). The manifest is only written when every output succeeded, so it never describes
+        # a partial run
+        try:
+            for future in self.futures:
+                future.result()
+        finally:
+            self.pool.shutdown(wait=True)
+
+        if self.manifest is not None:
+            self.manifest.write()
+
+        end_time = time.perf_counter()
+        return end_time - self.run_start, end_time - self.start_time
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.figure import Figure
+from matplotlib.ticker import PercentFormatter
+
+
+def calc_fuel_breakdown(df, type_column, fuel_columns):
+    # Sum every fuel column per property type in one grouped reduction over a (buildings x fuels) float32
+    # block; sums accumulate in float64 so city-wide totals do not drift
+    fuels = [fuel for fuel, fuel_column in fuel_columns.items() if fuel_column in df.columns]
+    codes, types = pd.factorize(df[type_column], sort=True)
+    block = df[[fuel_columns[fuel] for fuel in fuels]].to_numpy(dtype='float32', na_value=0.0)
+
+    keep = codes >= 0
+    sums = np.zeros((len(types), len(fuels)), dtype='float64')
+    np.add.at(sums, codes[keep], block[keep])
+
+    emissions_df = pd.DataFrame(sums, columns=fuels)
+    emissions_df.insert(0, type_column, np.asarray(types))
+    emissions_df['Total'] = sums.sum(axis=1)
+
+    # Share of each type's emissions coming from each fuel (rows sum to 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = sums / sums.sum(axis=1, keepdims=True)
+    share_df = pd.DataFrame(np.nan_to_num(shares), columns=fuels)
+    share_df.insert(0, type_column, np.asarray(types))
+
+    return emissions_df, share_df
+
+
+def plot_fuel_breakdown(share_df, type_column, filename, figsize=(14, 8)):
+    # Stacked horizontal bars of each type's fuel mix; fuels that never contribute are left out of the legend
+    fuels = [fuel for fuel in share_df.columns if fuel != type_column and share_df[fuel].any()]
+    shares = share_df[fuels].to_numpy(dtype='float64')
+    positions = np.arange(len(share_df))
+
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    left = np.zeros(len(share_df))
+    for fuel, color, column in zip(fuels, sns.color_palette('tab20', len(fuels)), shares.T):
+        ax.barh(positions, column, left=left, height=0.8, color=color, label=fuel)
+        left += column
+
+    ax.set_yticks(positions, labels=share_df[type_column].to_numpy())
+    ax.set_ylim(len(share_df) - 0.5, -0.5)
+    ax.set_xlim(0, 1)
+    ax.xaxis.set_major_formatter(PercentFormatter(1.0))
+    ax.grid(False, axis='y')
+
+    ax.set_title('Share of GHG Emissions by Fuel and Building Type')
+    ax.set_xlabel('Share of Total GHG Emissions')
+    ax.set_ylabel('Building Type')
+    ax.legend(loc='upper left', bbox_to_anchor=(1.01, 1), frameon=False)
+
+    fig.tight_layout()
+    fig.savefig(filename)
@@ -0,0 +1,170 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Canonical Taxonomy -------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+# Canonical categories follow BERDO's property type groups, plus Parking and Mixed Use which BERDO never
+# sees as a largest property type but LL84 and BEUDO report
+CANONICAL_CATEGORIES = [
+    'Assembly', 'College/University', 'Education', 'Food Sales & Service', 'Healthcare', 'Lodging',
+    'Manufacturing/Industrial', 'Mixed Use', 'Multifamily Housing', 'Office', 'Parking', 'Retail', 'Services',
+    'Storage', 'Technology/Science', 'Other',
+]
+OTHER_CODE = CANONICAL_CATEGORIES.index('Other')
+
+# Portfolio Manager property types (LL84 and BEUDO self-selected types, BERDO largest property type) grouped
+# the same way BERDO groups them
+PORTFOLIO_MANAGER_GROUPS = {
+    'Assembly': [
+        'Aquarium', 'Bowling Alley', 'Convention Center', 'Fitness Center/Health Club/Gym', 'Ice/Curling Rink',
+        'Indoor Arena', 'Movie Theater', 'Museum', 'Other - Entertainment/Public Assembly', 'Other - Recreation',
+        'Other - Stadium', 'Performing Arts', 'Race Track', 'Social/Meeting Hall', 'Stadium (Closed)',
+        'Stadium (Open)', 'Worship Facility', 'Zoo',
+    ],
+    'College/University': ['College/University'],
+    'Education': ['Adult Education', 'K-12 School', 'Other - Education', 'Pre-school/Daycare', 'Vocational School'],
+    'Food Sales & Service': [
+        'Bar/Nightclub', 'Bar/Nightclub N/A', 'Fast Food Restaurant', 'Food Sales', 'Food Service',
+        'Other - Restaurant/Bar', 'Restaurant', 'Supermarket/Grocery Store',
+    ],
+    'Healthcare': [
+        'Ambulatory Surgical Center', 'Hospital', 'Hospital (General Medical & Surgical)', 'Medical Office',
+        'Other - Specialty Hospital', 'Other/Specialty Hospital', 'Outpatient Rehabilitation/Physical Therapy',
+        'Urgent Care/Clinic/Other Outpatient',
+    ],
+    'Lodging': [
+        'Hotel', 'Other - Lodging/Residential', 'Residence Hall/Dormitory', 'Residential Care Facility',
+        'Senior Living Community',
+    ],
+    'Manufacturing/Industrial': ['Manufacturing/Industrial Plant'],
+    'Mixed Use': ['Mixed Use Property'],
+    'Multifamily Housing': [
+        'Multifamily Housing', 'Single Family Home', 'Single-Family Home', 'Immeuble à logements multiples',
+    ],
+    'Office': ['Financial Office', 'Office'],
+    'Parking': ['Parking'],
+    'Retail': [
+        'Automobile Dealership', 'Bank Branch', 'Enclosed Mall', 'Lifestyle Center', 'Other - Mall', 'Retail Store',
+        'Strip Mall', 'Wholesale Club/Supercenter',
+    ],
+    'Services': [
+        'Convenience Store without Gas Station', 'Courthouse', 'Drinking Water Treatment & Distribution',
+        'Energy/Power Station', 'Fire Station', 'Library', 'Mailing Center/Post Office', 'Other - Public Services',
+        'Other - Services', 'Other - Utility', 'Personal Services (Health/Beauty, Dry Cleaning, etc.)',
+        'Police Station', 'Repair Services (Vehicle, Shoe, Locksmith, etc)',
+        'Repair Services (Vehicle, Shoe, Locksmith, etc.)', 'Transportation Terminal/Station', 'Veterinary Office',
+        'Wastewater Treatment Plant',
+    ],
+    'Storage': [
+        'Distribution Center', 'Non-Refrigerated Warehouse', 'Refrigerated Warehouse', 'Self-Storage Facility',
+        'Storage',
+    ],
+    'Technology/Science': ['Data Center', 'Laboratory', 'Other - Technology/Science'],
+    'Other': ['Other', 'Prison/Incarceration'],
+}
+
+PORTFOLIO_MANAGER_LOOKUP = {
+    property_type: category
+    for category, property_types in PORTFOLIO_MANAGER_GROUPS.items()
+    for property_type in property_types
+}
+
+# LL84 self-selected property types exempt from compliance, dropped before any LL84 summary
+LL84_EXEMPT_PROPERTY_TYPES = [
+    'Worship Facility', 'Police Station', 'Prison/Incarceration', 'Courthouse', 'Energy/Power Station', 'Zoo',
+    'Mailing Center/Post Office',
+]
+
+# BERDO property types already are the canonical groups
+BERDO_LOOKUP = {category: category for category in CANONICAL_CATEGORIES}
+BERDO_LOOKUP['Property Type Not Recognized in Database'] = 'Other'
+
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Categorical Recode -------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+def recode_property_types(series, lookup):
+    # Look up each distinct raw type once, then recode every row by indexing with the categorical codes;
+    # unmapped or missing types fall into 'Other'
+    raw = series.astype('category')
+    category_codes = {category: code for code, category in enumerate(CANONICAL_CATEGORIES)}
+    lookup_table = np.array([category_codes.get(lookup.get(raw_type), OTHER_CODE)
+                             for raw_type in raw.cat.categories] + [OTHER_CODE], dtype='int8')
+
+    # Missing values have code -1, which indexes the trailing 'Other' entry
+    codes = lookup_table[raw.cat.codes.to_numpy()]
+
+    return pd.Series(pd.Categorical.from_codes(codes, categories=CANONICAL_CATEGORIES), index=series.index)
+
+
+def relabel_property_types(series, relabel):
+    # Rename raw types once per category rather than once per row. Unlike rename_categories, a new label that
+    # already exists merges with it; missing values stay missing
+    raw = series.astype('category')
+    labels = [relabel.get(raw_type, raw_type) for raw_type in raw.cat.categories]
+    categories = sorted(set(labels))
+    label_codes = {label: code for code, label in enumerate(categories)}
+    lookup_table = np.array([label_codes[label] for label in labels] + [-1], dtype='int32')
+
+    # Missing values have code -1, which indexes the trailing -1 entry
+    codes = lookup_table[raw.cat.codes.to_numpy()]
+
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=series.index)
+
+
+def unmapped_property_types(series, lookup):
+    return sorted(set(series.dropna().unique()) - set(lookup))
+
+
+def to_harmonized_frame(df, jurisdiction, type_column, lookup, gfa_column, ghg_column):
+    # Narrow columnar frame shared by all jurisdictions so they can be concatenated and aggregated together
+    return pd.DataFrame({
+        'jurisdiction': jurisdiction,
+        'property_type': df[type_column].to_numpy(dtype=object),
+        'canonical_type': recode_property_types(df[type_column], lookup).to_numpy(),
+        'gfa': pd.to_numeric(df[gfa_column], errors='coerce').to_numpy(dtype='float64'),
+        'ghg': pd.to_numeric(df[ghg_column], errors='coerce').to_numpy(dtype='float64'),
+    })
+
+
+def calc_combined_allocation(combined_df):
+    # Total count, GFA and GHG by canonical type across every jurisdiction in one grouped reduction
+    grouped = combined_df.groupby(['canonical_type', 'jurisdiction'], observed=True).agg(
+        total_count=('gfa', 'size'),
+        total_gfa=('gfa', 'sum'),
+        total_ghg=('ghg', 'sum')
+    )
+
+    summary_df = grouped.groupby(level='canonical_type', observed=True).sum()
+    summary_df['percentage_of_total_buildings'] = (summary_df['total_count'] / summary_df['total_count'].sum()) * 100
+    summary_df['percentage_of_total_gfa'] = (summary_df['total_gfa'] / summary_df['total_gfa'].sum()) * 100
+    summary_df['percentage_of_total_ghg'] = (summary_df['total_ghg'] / summary_df['total_ghg'].sum()) * 100
+
+    # Per-jurisdiction breakdown alongside the combined totals
+    by_jurisdiction = grouped.unstack('jurisdiction', fill_value=0)
+    by_jurisdiction.columns = [f'{jurisdiction} {metric}' for metric, jurisdiction in by_jurisdiction.columns]
+    summary_df = summary_df.join(by_jurisdiction)
+
+    return summary_df.reset_index()
+
+
+if __name__ == '__main__':
+    # Compare the categorical recode against a per-row replace on a large synthetic column
+    rng = np.random.default_rng(30)
+    bench_types = pd.Series(rng.choice(list(PORTFOLIO_MANAGER_LOOKUP), 1_000_000))
+
+    start = time.perf_counter()
+    recode_property_types(bench_types, PORTFOLIO_MANAGER_LOOKUP)
+    recode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bench_types.map(PORTFOLIO_MANAGER_LOOKUP).fillna('Other')
+    map_time = time.perf_counter() - start
+
+    print(f'{len(bench_types):,} rows: categorical recode {recode_time * 1000:.1f} ms, '
+          f'per-row map {map_time * 1000:.1f} ms')
@@ -0,0 +1,176 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from export_stage import atomic_write
+
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Content Hashing ----------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def row_keys(keys):
+    # Repeated keys (e.g. neighbourhoods split across several polygons) get ' [2]', ' [3]', ... in row order,
+    # so no row is silently dropped from the manifest
+    seen = {}
+    unique_keys = []
+    for key in map(str, keys):
+        seen[key] = seen.get(key, 0) + 1
+        unique_keys.append(key if seen[key] == 1 else f'{key} [{seen[key]}]')
+
+    return unique_keys
+
+
+def hash_table(df, key_column=None):
+    # One hash per row keyed by property type (or the first column), one per metric column, and one overall
+    key_column = key_column or df.columns[0]
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    return {
+        'key_column': key_column,
+        'digest': _digest(row_hashes.tobytes() + '\x1f'.join(map(str, df.columns)).encode()),
+        'rows': {key: f'{row_hash:016x}' for key, row_hash in zip(row_keys(df[key_column]), row_hashes)},
+        'columns': {str(column): _digest(pd.util.hash_pandas_object(df[column], index=False).to_numpy().tobytes())
+                    for column in df.columns},
+    }
+
+
+def hash_file(path):
+    with open(path, 'rb') as f:
+        return {'digest': _digest(f.read())}
+
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Manifest -----------------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+class RunManifest:
+    # Content hashes of every output of a run, taken from the in-memory frames as they are exported
+    def __init__(self, path):
+        self.path = path
+        self.outputs = {}
+        self.lock = threading.Lock()
+
+    def _add(self, output_path, entry):
+        with self.lock:
+            self.outputs[os.path.basename(output_path)] = entry
+
+    def add_table(self, output_path, df):
+        self._add(output_path, {'type': 'table', **hash_table(df)})
+
+    def add_workbook(self, output_path, sheets):
+        self._add(output_path, {'type': 'workbook',
+                                'sheets': {sheet_name: hash_table(sheet_df) for sheet_name, sheet_df in sheets.items()}})
+
+    def add_file(self, output_path):
+        self._add(output_path, {'type': 'file', **hash_file(output_path)})
+
+    def write(self):
+        manifest = {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'outputs': dict(sorted(self.outputs.items()))}
+
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+        def rotate():
+            # The previous manifest is kept alongside, so a refresh can be diffed against the last run; it is
+            # only rotated once the new manifest is fully written, so a failed write leaves the current one
+            if os.path.exists(self.path):
+                root, extension = os.path.splitext(self.path)
+                os.replace(self.path, f'{root}.previous{extension}')
+
+        return atomic_write(self.path, write, before_replace=rotate)
+
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Diff ---------------------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+def diff_tables(old, new):
+    # Keys added, removed or changed, and metric columns whose values changed
+    changes = []
+    old_rows, new_rows = old['rows'], new['rows']
+    added = [key for key in new_rows if key not in old_rows]
+    removed = [key for key in old_rows if key not in new_rows]
+    changed = [key for key in new_rows if key in old_rows and new_rows[key] != old_rows[key]]
+
+    if added:
+        changes.append(f'added {new["key_column"]}: {", ".join(added)}')
+    if removed:
+        changes.append(f'removed {old["key_column"]}: {", ".join(removed)}')
+    if changed:
+        changes.append(f'changed {new["key_column"]}: {", ".join(changed)}')
+
+    old_columns, new_columns = old['columns'], new['columns']
+    changed_columns = [column for column in new_columns
+                       if column in old_columns and new_columns[column] != old_columns[column]]
+    if changed_columns:
+        changes.append(f'changed metrics: {", ".join(changed_columns)}')
+    if set(old_columns) != set(new_columns):
+        changes.append(f'columns added: {sorted(set(new_columns) - set(old_columns))}, '
+                       f'removed: {sorted(set(old_columns) - set(new_columns))}')
+
+    return changes
+
+
+def diff_manifests(old_manifest, new_manifest):
+    # {output name: [change descriptions]} for every output that differs between two runs
+    old_outputs, new_outputs = old_manifest['outputs'], new_manifest['outputs']
+    differences = {}
+
+    for name in sorted(set(old_outputs) | set(new_outputs)):
+        if name not in new_outputs:
+            differences[name] = ['output removed']
+        elif name not in old_outputs:
+            differences[name] = ['output added']
+        else:
+            old, new = old_outputs[name], new_outputs[name]
+            if new['type'] == 'table':
+                changes = [] if old['digest'] == new['digest'] else diff_tables(old, new)
+            elif new['type'] == 'workbook':
+                changes = []
+                for sheet_name in sorted(set(old['sheets']) | set(new['sheets'])):
+                    if sheet_name not in new['sheets'] or sheet_name not in old['sheets']:
+                        changes.append(f'sheet {sheet_name!r} {"removed" if sheet_name in old["sheets"] else "added"}')
+                    elif old['sheets'][sheet_name]['digest'] != new['sheets'][sheet_name]['digest']:
+                        changes += [f'sheet {sheet_name!r}: {change}'
+                                    for change in diff_tables(old['sheets'][sheet_name], new['sheets'][sheet_name])]
+            else:
+                changes = [] if old['digest'] == new['digest'] else ['content changed']
+
+            if changes:
+                differences[name] = changes
+
+    return differences
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the run manifests of two pipeline runs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    diff_parser = subparsers.add_parser('diff', help='list outputs, property types and metrics that changed')
+    diff_parser.add_argument('old_manifest', help='e.g. ../data-files/LL_84_data_files/LL84-run_manifest.previous.json')
+    diff_parser.add_argument('new_manifest', help='e.g. ../data-files/LL_84_data_files/LL84-run_manifest.json')
+    args = parser.parse_args()
+
+    with open(args.old_manifest) as f:
+        old_manifest = json.load(f)
+    with open(args.new_manifest) as f:
+        new_manifest = json.load(f)
+
+    differences = diff_manifests(old_manifest, new_manifest)
+    if not differences:
+        print('No changes')
+    for name, changes in differences.items():
+        print(name)
+        for change in changes:
+            print(f'  {change}')
@@ -0,0 +1,254 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_M = 6371008.8
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Grid Index ---------------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+
+class GridIndex:
+    def __init__(self, lat, lon, cell_size_deg=0.01):
+        self.lat = np.asarray(lat, dtype='float64')
+        self.lon = np.asarray(lon, dtype='float64')
+        self.cell_size = cell_size_deg
+
+        # Buildings without coordinates are kept out of the index but keep their positions
+        valid = np.isfinite(self.lat) & np.isfinite(self.lon)
+        self.lat0 = np.floor(self.lat[valid].min() / cell_size_deg) * cell_size_deg if valid.any() else 0.0
+        self.lon0 = np.floor(self.lon[valid].min() / cell_size_deg) * cell_size_deg if valid.any() else 0.0
+        rows = np.floor((np.where(valid, self.lat, self.lat0) - self.lat0) / cell_size_deg).astype('int64')
+        cols = np.floor((np.where(valid, self.lon, self.lon0) - self.lon0) / cell_size_deg).astype('int64')
+        self.n_rows = int(rows[valid].max()) + 1 if valid.any() else 1
+        self.n_cols = int(cols[valid].max()) + 1 if valid.any() else 1
+
+        # Cell id per building (-1 when it has no coordinates)
+        self.cell_ids = np.where(valid, rows * self.n_cols + cols, -1)
+
+        # Buildings sorted by cell so each cell (and each row of cells) is one contiguous slice
+        positions = np.flatnonzero(valid)
+        order = np.argsort(self.cell_ids[positions], kind='stable')
+        self.order = positions[order]
+        self.sorted_cells = self.cell_ids[self.order]
+
+    def _candidates(self, lat_min, lat_max, lon_min, lon_max):
+        # Buildings in every cell overlapping the bounding box, gathered one row of cells at a time
+        r0 = max(int(np.floor((lat_min - self.lat0) / self.cell_size)), 0)
+        r1 = min(int(np.floor((lat_max - self.lat0) / self.cell_size)), self.n_rows - 1)
+        c0 = max(int(np.floor((lon_min - self.lon0) / self.cell_size)), 0)
+        c1 = min(int(np.floor((lon_max - self.lon0) / self.cell_size)), self.n_cols - 1)
+        if r0 > r1 or c0 > c1:
+            return np.empty(0, dtype='int64')
+
+        row_ids = np.arange(r0, r1 + 1) * self.n_cols
+        starts = np.searchsorted(self.sorted_cells, row_ids + c0, side='left')
+        ends = np.searchsorted(self.sorted_cells, row_ids + c1, side='right')
+
+        return np.concatenate([self.order[start:end] for start, end in zip(starts, ends)])
+
+    def bbox(self, lat_min, lat_max, lon_min, lon_max):
+        candidates = self._candidates(lat_min, lat_max, lon_min, lon_max)
+        lat = self.lat[candidates]
+        lon = self.lon[candidates]
+        inside = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+
+        return np.sort(candidates[inside])
+
+    def radius(self, lat, lon, radius_m):
+        # Prefilter with the enclosing bounding box, then keep exact great-circle matches
+        dlat = np.degrees(radius_m / EARTH_RADIUS_M)
+        dlon = dlat / max(np.cos(np.radians(lat)), 1e-12)
+        candidates = self._candidates(lat - dlat, lat + dlat, lon - dlon, lon + dlon)
+        distances = haversine_m(lat, lon, self.lat[candidates], self.lon[candidates])
+        inside = distances <= radius_m
+
+        order = np.argsort(candidates[inside])
+        return candidates[inside][order], distances[inside][order]
+
+    def cell_centers(self, cell_ids):
+        cell_ids = np.asarray(cell_ids)
+        center_lat = self.lat0 + (cell_ids // self.n_cols + 0.5) * self.cell_size
+        center_lon = self.lon0 + (cell_ids % self.n_cols + 0.5) * self.cell_size
+
+        return center_lat, center_lon
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Polygons -----------------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+def load_geojson_polygons(file_path, name_property):
+    # Returns a list of (name, rings) where each ring is an (n, 2) lon/lat array; holes are just extra rings
+    with open(file_path) as f:
+        geojson = json.load(f)
+
+    polygons = []
+    for feature in geojson['features']:
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            ring_lists = [geometry['coordinates']]
+        elif geometry['type'] == 'MultiPolygon':
+            ring_lists = geometry['coordinates']
+        else:
+            continue
+
+        rings = [np.asarray(ring, dtype='float64')[:, :2] for ring_list in ring_lists for ring in ring_list]
+        polygons.append((feature['properties'][name_property], rings))
+
+    return polygons
+
+
+def points_in_rings(lat, lon, rings):
+    # Even-odd ray casting over every edge of every ring at once (points x edges)
+    starts = np.concatenate([ring for ring in rings])
+    ends = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+    x1, y1 = starts[:, 0], starts[:, 1]
+    x2, y2 = ends[:, 0], ends[:, 1]
+
+    px = lon[:, None]
+    py = lat[:, None]
+    crosses = (y1 > py) != (y2 > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+
+    return np.count_nonzero(crosses & (px < x_cross), axis=1) % 2 == 1
+
+
+def assign_polygons(index, polygons):
+    # Polygon position per building (-1 when outside every polygon); the first matching polygon wins
+    assignment = np.full(len(index.lat), -1, dtype='int64')
+
+    for position, (_, rings) in enumerate(polygons):
+        vertices = np.concatenate(rings)
+        candidates = index.bbox(vertices[:, 1].min(), vertices[:, 1].max(),
+                                vertices[:, 0].min(), vertices[:, 0].max())
+        candidates = candidates[assignment[candidates] == -1]
+        if len(candidates) == 0:
+            continue
+
+        inside = points_in_rings(index.lat[candidates], index.lon[candidates], rings)
+        assignment[candidates[inside]] = position
+
+    return assignment
+
+
+# --------------------------------------------------------------------------------------------------------
+# ----------------------------------- Aggregation --------------------------------------------------------
+# --------------------------------------------------------------------------------------------------------
+
+def rollup_by_group(codes, n_groups, gfa, ghg, eui):
+    # Building count, GFA, GHG and GFA-weighted EUI per group code; negative codes are dropped
+    keep = codes >= 0
+    codes = codes[keep]
+    gfa = np.nan_to_num(np.asarray(gfa, dtype='float64')[keep])
+    ghg = np.nan_to_num(np.asarray(ghg, dtype='float64')[keep])
+    eui = np.asarray(eui, dtype='float64')[keep]
+
+    has_eui = np.isfinite(eui)
+    total_gfa = np.bincount(codes, weights=gfa, minlength=n_groups)
+    eui_gfa = np.bincount(codes[has_eui], weights=gfa[has_eui], minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weighted_eui = np.bincount(codes[has_eui], weights=(eui * gfa)[has_eui], minlength=n_groups) / eui_gfa
+
+    return pd.DataFrame({
+        'total_count': np.bincount(codes, minlength=n_groups),
+        'total_gfa': total_gfa,
+        'total_ghg': np.bincount(codes, weights=ghg, minlength=n_groups),
+        'gfa_weighted_eui': weighted_eui,
+    })
+
+
+def rollup_by_grid_cell(df, index, gfa_column, ghg_column, eui_column):
+    cells, codes = np.unique(index.cell_ids, return_inverse=True)
+    codes = np.where(index.cell_ids >= 0, codes, -1)
+    summary_df = rollup_by_group(codes, len(cells), df[gfa_column], df[ghg_column], df[eui_column])
+
+    center_lat, center_lon = index.cell_centers(cells)
+    summary_df.insert(0, 'grid_cell', cells)
+    summary_df.insert(1, 'center_latitude', center_lat)
+    summary_df.insert(2, 'center_longitude', center_lon)
+
+    return summary_df[summary_df['grid_cell'] >= 0].reset_index(drop=True)
+
+
+def rollup_by_polygon(df, index, polygons, gfa_column, ghg_column, eui_column):
+    assignment = assign_polygons(index, polygons)
+    summary_df = rollup_by_group(assignment, len(polygons), df[gfa_column], df[ghg_column], df[eui_column])
+    summary_df.insert(0, 'polygon', [name for name, _ in polygons])
+
+    return summary_df
+
+
+def rollup_within_radius(df, index, lat, lon, radius_m, gfa_column, ghg_column, eui_column):
+    positions, _ = index.radius(lat, lon, radius_m)
+    codes = np.full(len(index.lat), -1, dtype='int64')
+    codes[positions] = 0
+
+    return rollup_by_group(codes, 1, df[gfa_column], df[ghg_column], df[eui_column]).iloc[0]
+
+
+if __name__ == '__main__':
+    # Throughput benchmark on synthetic NYC-sized data: tens of thousands of buildings, hundreds of polygons
+    rng = np.random.default_rng(84)
+    n_buildings = 30000
+    bench_df = pd.DataFrame({
+        'Latitude': rng.uniform(40.50, 40.92, n_buildings),
+        'Longitude': rng.uniform(-74.26, -73.70, n_buildings),
+        'Gross Floor Area (ft2)': rng.lognormal(11, 1, n_buildings),
+        'Total GHG Emissions (Metric Tons CO2e)': rng.lognormal(6, 1, n_buildings),
+        'Site EUI (kBtu/sf)': rng.lognormal(4.3, 0.4, n_buildings),
+    })
+
+    # 20 x 15 grid of jittered hexagons standing in for neighbourhood polygons
+    bench_polygons = []
+    angles = np.linspace(0, 2 * np.pi, 7)[:-1]
+    for i in range(20):
+        for j in range(15):
+            center_lat = 40.50 + (j + 0.5) * 0.028
+            center_lon = -74.26 + (i + 0.5) * 0.028
+            radius = 0.014 * rng.uniform(0.8, 1.1, len(angles))
+            ring = np.column_stack([center_lon + radius * np.cos(angles), center_lat + radius * np.sin(angles)])
+            bench_polygons.append((f'polygon_{i}_{j}', [ring]))
+
+    columns = ('Gross Floor Area (ft2)', 'Total GHG Emissions (Metric Tons CO2e)', 'Site EUI (kBtu/sf)')
+
+    start = time.perf_counter()
+    bench_index = GridIndex(bench_df['Latitude'], bench_df['Longitude'])
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        bench_index.radius(40.75, -73.98, 1000)
+    radius_time = (time.perf_counter() - start) / 1000
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        bench_index.bbox(40.70, 40.76, -74.02, -73.95)
+    bbox_time = (time.perf_counter() - start) / 1000
+
+    start = time.perf_counter()
+    grid_df = rollup_by_grid_cell(bench_df, bench_index, *columns)
+    grid_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    polygon_df = rollup_by_polygon(bench_df, bench_index, bench_polygons, *columns)
+    polygon_time = time.perf_counter() - start
+
+    print(f'{n_buildings} buildings, {len(bench_polygons)} polygons')
+    print(f'Index build:        {build_time * 1000:.2f} ms')
+    print(f'Radius query (1km): {radius_time * 1000:.3f} ms')
+    print(f'Bounding-box query: {bbox_time * 1000:.3f} ms')
+    print(f'Grid rollup:        {grid_time * 1000:.2f} ms ({len(grid_df)} cells)')
+    print(f'Polygon rollup:     {polygon_time * 1000:.2f} ms '
+          f'({n_buildings / polygon_time:,.0f} buildings/s, {polygon_df["total_count"].sum()} assigned)')
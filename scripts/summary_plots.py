@@ -0,0 +1,98 @@
+import time
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+
+# (value column, percentage column, palette, title, x label) for each panel of the summary chart
+SUMMARY_PANELS = [
+    ('total_count', 'percent_of_total_buildings', 'Blues_d', 'Total Count of Buildings by Type', 'Total Count'),
+    ('total_gfa', 'percent_of_total_gfa', 'Reds_d', 'Total Gross Floor Area (GFA) by Building Type',
+     'Total GFA (ft²)'),
+    ('total_ghg', 'percent_of_total_ghg', 'Greens_d', 'Total GHG Emissions (MT CO2e) by Building Type',
+     'Total GHG (MT CO2e)'),
+]
+
+
+def plot_summary_chart(df, type_column, filename, figsize=(18, 8)):
+    # Figure is created without pyplot so no global figure manager is involved
+    fig = Figure(figsize=figsize)
+    axes = fig.subplots(1, len(SUMMARY_PANELS))
+
+    types = df[type_column].to_numpy()
+    positions = np.arange(len(types))
+
+    for ax, (value_column, percent_column, palette, title, xlabel) in zip(axes, SUMMARY_PANELS):
+        values = df[value_column].to_numpy(dtype='float64')
+        labels = np.char.mod('%.1f%%', df[percent_column].to_numpy(dtype='float64'))
+
+        # One barh call per axis, with labels attached to the whole bar container at once
+        bars = ax.barh(positions, values, height=0.8, color=sns.color_palette(palette, len(types)))
+        ax.bar_label(bars, labels=labels, padding=4)
+
+        ax.set_yticks(positions, labels=types)
+        ax.set_ylim(len(types) - 0.5, -0.5)
+        ax.grid(False, axis='y')
+
+        # Extend x-axis by 15% to make room for the percentage labels; ticks come from a locator
+        max_value = values.max() if len(values) else 1.0
+        ax.set_xlim(0, max_value * 1.15)
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=6))
+
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel('Building Type' if ax is axes[0] else '')
+
+    fig.tight_layout()
+    fig.savefig(filename)
+
+
+def legacy_plot_summary_chart(df, type_column, filename, figsize=(18, 8)):
+    # Previous seaborn barplot + per-bar ax.text renderer, kept for benchmarking
+    fig, axes = plt.subplots(1, len(SUMMARY_PANELS), figsize=figsize)
+
+    for ax, (value_column, percent_column, palette, title, xlabel) in zip(axes, SUMMARY_PANELS):
+        sns.barplot(x=value_column, y=type_column, data=df, ax=ax, hue=type_column, palette=palette, legend=False)
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel('Building Type' if ax is axes[0] else '')
+
+        max_value = df[value_column].max()
+        ax.set_xlim(0, max_value * 1.15)
+
+        for index, value in enumerate(df[value_column]):
+            percentage = df[percent_column].iloc[index]
+            ax.text(value + (0.02 * max_value), index, f'{percentage:.1f}%', va='center')
+
+    plt.tight_layout()
+    plt.savefig(filename)
+    plt.close()
+
+
+if __name__ == '__main__':
+    # Benchmark both renderers on owner-level sized charts
+    sns.set_theme(style="whitegrid", palette="pastel")
+    rng = np.random.default_rng(29)
+
+    for n_bars in (14, 70, 300):
+        bench_df = pd.DataFrame({
+            'Property Type': [f'Type {i}' for i in range(n_bars)],
+            'total_count': rng.integers(1, 2000, n_bars),
+            'total_gfa': rng.uniform(1e4, 1e8, n_bars),
+            'total_ghg': rng.uniform(1e2, 1e6, n_bars),
+        })
+        for value_column, percent_column, *_ in SUMMARY_PANELS:
+            bench_df[percent_column] = bench_df[value_column] / bench_df[value_column].sum() * 100
+
+        figsize = (18, max(8, n_bars * 0.15))
+        timings = {}
+        for name, renderer in [('legacy', legacy_plot_summary_chart), ('batched', plot_summary_chart)]:
+            start = time.perf_counter()
+            renderer(bench_df, 'Property Type', f'/tmp/summary_chart_{name}.png', figsize)
+            timings[name] = time.perf_counter() - start
+
+        print(f'{n_bars:>4} bars: legacy {timings["legacy"] * 1000:7.1f} ms, '
+              f'batched {timings["batched"] * 1000:7.1f} ms ({timings["legacy"] / timings["batched"]:.1f}x)')
@@ -0,0 +1,89 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from type_summary import COMBINES, TypeSummary
+
+# Default grid: 0% to 10% share in 0.5% steps for each of count, GFA and GHG
+DEFAULT_THRESHOLDS = np.round(np.arange(0, 0.1001, 0.005), 4)
+
+
+def sweep_significance_thresholds(summary, count_thresholds, gfa_thresholds, ghg_thresholds, combines=('and', 'or')):
+    unknown = [combine for combine in combines if combine not in COMBINES]
+    if unknown:
+        raise ValueError(f'combine must be one of {COMBINES}, got {unknown}')
+
+    count_thresholds = np.asarray(count_thresholds, dtype='float64')
+    gfa_thresholds = np.asarray(gfa_thresholds, dtype='float64')
+    ghg_thresholds = np.asarray(ghg_thresholds, dtype='float64')
+
+    # Pass/fail per (threshold, type) for each metric; shares are computed once from the allocation table
+    passes_count = summary.shares[0] >= count_thresholds[:, None]
+    passes_gfa = summary.shares[1] >= gfa_thresholds[:, None]
+    passes_ghg = summary.shares[2] >= ghg_thresholds[:, None]
+
+    # Broadcast to (count x gfa x ghg x types) and flatten to one selection row per combination
+    a = passes_count[:, None, None, :]
+    b = passes_gfa[None, :, None, :]
+    c = passes_ghg[None, None, :, :]
+    grid_shape = (len(count_thresholds), len(gfa_thresholds), len(ghg_thresholds))
+    masks = {'and': a & b & c, 'or': a | b | c}
+    selections = np.concatenate([masks[combine].reshape(-1, len(summary)) for combine in combines])
+
+    # Coverage of each metric by the selected types, one matrix multiply for every combination
+    coverage = selections @ summary.shares.T * 100
+
+    # Type lists are only joined once per distinct selection; rows are bit-packed into fixed-width byte keys
+    # so finding distinct selections is a 1-D factorize rather than a row-wise unique
+    packed = np.packbits(selections, axis=1)
+    selection_ids, _ = pd.factorize(packed.view(f'S{packed.shape[1]}').ravel())
+    unique_selections = np.unpackbits(packed[np.unique(selection_ids, return_index=True)[1]], axis=1,
+                                      count=len(summary)).astype(bool)
+    selected_types = np.array(['; '.join(summary.types[selection]) for selection in unique_selections], dtype=object)
+
+    count_grid, gfa_grid, ghg_grid = (grid.ravel() for grid in np.meshgrid(
+        count_thresholds, gfa_thresholds, ghg_thresholds, indexing='ij'))
+    n_combines = len(combines)
+
+    return pd.DataFrame({
+        'count_threshold': np.tile(count_grid, n_combines),
+        'gfa_threshold': np.tile(gfa_grid, n_combines),
+        'ghg_threshold': np.tile(ghg_grid, n_combines),
+        'combine': np.repeat(combines, np.prod(grid_shape)),
+        'types_selected': selections.sum(axis=1),
+        'coverage_of_total_buildings': coverage[:, 0],
+        'coverage_of_total_gfa': coverage[:, 1],
+        'coverage_of_total_ghg': coverage[:, 2],
+        'selected_types': selected_types[selection_ids],
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Evaluate a grid of significance cutoffs against a building type allocation summary CSV')
+    parser.add_argument('summary_csv', help='e.g. ../data-files/berdo_data_files/berdo-building_summary.csv')
+    parser.add_argument('--type-column', help='property type column (default: first column of the CSV)')
+    parser.add_argument('--count', type=float, nargs='+', default=DEFAULT_THRESHOLDS,
+                        help='building count share cutoffs, as fractions')
+    parser.add_argument('--gfa', type=float, nargs='+', default=DEFAULT_THRESHOLDS, help='GFA share cutoffs')
+    parser.add_argument('--ghg', type=float, nargs='+', default=DEFAULT_THRESHOLDS, help='GHG share cutoffs')
+    parser.add_argument('--combine', nargs='+', choices=COMBINES, default=list(COMBINES))
+    parser.add_argument('--output', help='CSV path for the sweep results (default: print a preview)')
+    args = parser.parse_args()
+
+    allocation_df = pd.read_csv(args.summary_csv)
+    type_column = args.type_column or allocation_df.columns[0]
+
+    start = time.perf_counter()
+    sweep_df = sweep_significance_thresholds(TypeSummary.from_frame(allocation_df, type_column),
+                                             args.count, args.gfa, args.ghg, tuple(args.combine))
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        sweep_df.to_csv(args.output, index=False)
+    else:
+        print(sweep_df.head(20).to_string(index=False))
+
+    print(f'{len(sweep_df):,} threshold combinations x {len(allocation_df)} types in {elapsed * 1000:.1f} ms')
@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# Allocation metrics held in each row of TypeSummary.values, with their percentage column names
+METRICS = ('total_count', 'total_gfa', 'total_ghg')
+PERCENT_COLUMNS = ('percent_of_total_buildings', 'percent_of_total_gfa', 'percent_of_total_ghg')
+
+# How the per-metric share cutoffs combine: a type must pass all of them ('and') or any of them ('or')
+COMBINES = ('and', 'or')
+
+
+class TypeSummary:
+    # Array-backed building type allocation: one (metrics x types) block plus the totals its shares are
+    # taken against. Subsets keep their parent's totals, so percentages stay relative to the whole portfolio.
+    __slots__ = ('types', 'values', 'totals', 'shares')
+
+    def __init__(self, types, values, totals=None):
+        self.types = types
+        self.values = values
+        self.totals = values.sum(axis=1) if totals is None else totals
+        self.shares = values / self.totals[:, None]
+
+    @classmethod
+    def from_frame(cls, df, type_column):
+        values = df[list(METRICS)].to_numpy(dtype='float64').T
+        return cls(df[type_column].to_numpy(dtype=object), values)
+
+    def __len__(self):
+        return len(self.types)
+
+    def select(self, mask):
+        return TypeSummary(self.types[mask], self.values[:, mask], self.totals)
+
+    def significant(self, count_share, gfa_share, ghg_share, combine='and'):
+        if combine not in COMBINES:
+            raise ValueError(f'combine must be one of {COMBINES}, got {combine!r}')
+
+        passes = self.shares >= np.array([[count_share], [gfa_share], [ghg_share]])
+        mask = passes.all(axis=0) if combine == 'and' else passes.any(axis=0)
+
+        return self.select(mask)
+
+    def sorted(self):
+        # Descending by count, then GFA, then GHG
+        order = np.lexsort((-self.values[2], -self.values[1], -self.values[0]))
+        return self.select(order)
+
+    def share_of(self, reference_total, metric='total_ghg'):
+        return self.values[METRICS.index(metric)] / reference_total
+
+    def to_frame(self, type_column, reference_ghg=None):
+        # Only built at output time; reference_ghg maps column name -> external GHG total (e.g. city-wide)
+        columns = {type_column: self.types}
+        for metric, row in zip(METRICS, self.values):
+            columns[metric] = row.astype('int64') if metric == 'total_count' else row
+        for percent_column, row in zip(PERCENT_COLUMNS, self.shares):
+            columns[percent_column] = row * 100
+        for column, reference_total in (reference_ghg or {}).items():
+            columns[column] = self.share_of(reference_total)
+
+        return pd.DataFrame(columns)
+
+
+if __name__ == '__main__':
+    # Per-summary construction + filter + percentages, DataFrame pipeline vs. TypeSummary
+    allocation_df = pd.read_csv('../data-files/berdo_data_files/berdo-building_summary.csv')
+    type_column = 'BERDO Property Type'
+    n_runs = 2000
+
+    start = time.perf_counter()
+    for _ in range(n_runs):
+        frame = allocation_df[[type_column, *METRICS]].copy()
+        totals = frame[list(METRICS)].sum()
+        frame = frame[(frame['total_count'] / totals['total_count'] >= 0.02) &
+                      (frame['total_gfa'] / totals['total_gfa'] >= 0.02) &
+                      (frame['total_ghg'] / totals['total_ghg'] >= 0.05)]
+        frame = frame.sort_values(by=list(METRICS), ascending=False).copy()
+        for metric, percent_column in zip(METRICS, PERCENT_COLUMNS):
+            frame[percent_column] = frame[metric] / totals[metric] * 100
+    frame_time = (time.perf_counter() - start) / n_runs
+
+    types = allocation_df[type_column].to_numpy(dtype=object)
+    values = allocation_df[list(METRICS)].to_numpy(dtype='float64').T
+    start = time.perf_counter()
+    for _ in range(n_runs):
+        summary = TypeSummary(types, values).significant(0.02, 0.02, 0.05).sorted()
+    summary_time = (time.perf_counter() - start) / n_runs
+
+    print(f'DataFrame pipeline: {frame_time * 1e6:8.1f} us per summary')
+    print(f'TypeSummary:        {summary_time * 1e6:8.1f} us per summary ({frame_time / summary_time:.0f}x)')